@@ -2,7 +2,10 @@
 Driver file
 """
 
-from tests import test_0
+import logging
+import sys
+
+from tests import test_0, test_1, test_2
 
 
 def main():
@@ -10,9 +13,18 @@ def main():
     Driver
     """
 
+    # Show fills as they happen
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s", stream=sys.stdout)
+
     print("\nRunning test_0 -------")
     test_0()
 
+    print("\nRunning test_1 -------")
+    test_1()
+
+    print("\nRunning test_2 -------")
+    test_2()
+
 
 if __name__ == "__main__":
     main()
@@ -2,13 +2,27 @@
 Everything related to orders
 """
 
-from copy import deepcopy
-from dataclasses import dataclass
+from dataclasses import InitVar, dataclass, field
 from enum import IntEnum
+import itertools
+import math
+import sys
 import time
-import uuid
+from typing import Callable
 
-from util import Dollars, InvalidOrderException, Timestamp, make_human_readable
+from util import (
+    Dollars,
+    InvalidOrderException,
+    OrderId,
+    Price,
+    Timestamp,
+    format_price,
+    make_human_readable,
+    to_price,
+)
+
+# Order IDs are unique and monotonically increasing
+next_order_id: Callable[[], OrderId] = itertools.count(1).__next__
 
 
 class OrderDirection(IntEnum):
@@ -24,13 +38,14 @@ class OrderDirection(IntEnum):
     BID = -1
 
 
-@dataclass
+@dataclass(slots=True)
 class Order:
     """
     One order being submitted and/or executed
 
-    If an order is partially filled,
-    it will be split into multiple orders (with the same `submitted_at`).
+    Each fill is recorded as a `Trade`, and reduces `quantity`,
+    which is the number of shares that haven't been filled yet.
+    Once `quantity` reaches 0, `filled_at` and `filled_price` are set.
 
     Once an order is filled, it cannot be updated or cancelled.
     """
@@ -39,24 +54,37 @@ class Order:
     direction: OrderDirection
     quantity: int
 
+    # Set in `__post_init__`, declared here so they get slots
+    order_id: OrderId = field(init=False, compare=False)
+    submitted_at: Timestamp = field(init=False, compare=False)
+    filled_at: Timestamp = field(init=False, compare=False)
+    filled_price: Price = field(init=False, compare=False)
+    canceled_at: Timestamp = field(init=False, compare=False)
+
     def __post_init__(self) -> "Order":
         """
         Post init method
         """
 
+        if not isinstance(self.quantity, int):
+            raise InvalidOrderException(self, "Quantity must be a whole number")
         if self.quantity <= 0:
             raise InvalidOrderException(self, "Quantity must be positive")
         if not self.ticker:
             raise InvalidOrderException(self, "Ticker must be non-empty")
-        if self.direction not in OrderDirection:
+        if not isinstance(self.direction, OrderDirection):
             raise InvalidOrderException(self, "Invalid direction")
 
-        self.order_id: uuid.UUID = uuid.uuid4()
-        self.submitted_at: Timestamp = time.time()
-        self.filled_at: Timestamp = None
-        self.filled_price: Dollars = None
+        # Interned, so comparing against the order book's ticker is mostly
+        # an identity check
+        self.ticker = sys.intern(self.ticker)
+
+        self.order_id = next_order_id()
+        self.submitted_at = time.time()
+        self.filled_at = None
+        self.filled_price = None
 
-        self.canceled_at: Timestamp = None
+        self.canceled_at = None
 
         return self
 
@@ -71,72 +99,52 @@ class Order:
             + "}"
         )
 
-    def __str__(self) -> str:
-        """
-        Representation of the order
-        """
-
-        return self.__repr__()
-
-    def fill_partially(self, quantity: int, filled_price: Dollars) -> "Order":
-        """
-        Split this order into two orders
+    def max_match_priority(self) -> float:
         """
+        Highest priority on the opposite side that this order can be matched with
 
-        if quantity <= 0:
-            raise InvalidOrderException(self, "Quantity must be positive")
-
-        if quantity >= self.quantity:
-            raise InvalidOrderException(
-                self, "Quantity must be less than the original order"
-            )
-
-        copied_order = deepcopy(self)
-        copied_order.quantity = quantity
-        copied_order.order_id = uuid.uuid4()
-        copied_order.filled_at = time.time()
-        copied_order.filled_price = filled_price
-
-        print(
-            f"\t--> Filled at ${filled_price} ({quantity} of {self.quantity} shares): {self}"
-        )
-
-        self.quantity -= quantity
-
-        return copied_order
-
-    def fill_fully(self, filled_price: Dollars) -> "Order":
+        Without a limit price, any price level will do
         """
-        Fill this order completely
-        """
-
-        self.filled_at = time.time()
-        self.filled_price = filled_price
 
-        print(
-            f"\t--> Filled at ${filled_price} ({self.quantity} of {self.quantity} shares): {self}"
-        )
-
-        return self
+        return math.inf
 
 
-@dataclass
+@dataclass(slots=True)
 class LimitOrder(Order):
     """
     An submitted order executed only when a certain price is reached
+
+    The limit price is given in dollars (`limit_price_dollars`),
+    and stored in ticks (`limit_price`)
     """
 
-    limit_price: Dollars
+    limit_price_dollars: InitVar[Dollars]
+
+    limit_price: Price = field(init=False)
 
-    def __post_init__(self) -> "LimitOrder":
+    # Signed price (`direction * limit_price`), which the order book sorts on.
+    # Lower is better, for both bids and asks
+    priority: Price = field(init=False, compare=False)
+
+    def __post_init__(self, limit_price_dollars: Dollars) -> "LimitOrder":
         """
         Post init method
         """
 
+        try:
+            self.limit_price = to_price(limit_price_dollars)
+        except ValueError as e:
+            raise InvalidOrderException(self, f"Invalid limit price: {e}") from e
+
         if self.limit_price <= 0:
             raise InvalidOrderException(self, "Limit price must be positive")
 
-        super().__post_init__()
+        # `slots=True` creates a new class, which breaks zero-argument `super()`,
+        # so call the parent explicitly here and below
+        Order.__post_init__(self)
+
+        # Only once the direction has been validated
+        self.priority = self.direction * self.limit_price
 
         return self
 
@@ -147,19 +155,22 @@ class LimitOrder(Order):
 
         return (
             "{"
-            + f"LimitOrder(ticker={self.ticker}, direction={self.direction.name}, quantity={self.quantity}, limit_price=${self.limit_price}, submitted_at={make_human_readable(self.submitted_at)})"
+            + f"LimitOrder(ticker={self.ticker}, direction={self.direction.name}, quantity={self.quantity}, limit_price=${format_price(self.limit_price)}, submitted_at={make_human_readable(self.submitted_at)})"
             + "}"
         )
 
-    def __str__(self) -> str:
+    def max_match_priority(self) -> float:
         """
-        Representation of the order
+        Highest priority on the opposite side that this order can be matched with
+
+        Opposite levels are keyed by `-direction * price`, so the levels up to
+        `-priority` are exactly those that cross this order's limit price
         """
 
-        return self.__repr__()
+        return -self.priority
 
 
-@dataclass
+@dataclass(slots=True)
 class MarketOrder(Order):
     """
     An order executed at the current best market price
@@ -170,7 +181,7 @@ class MarketOrder(Order):
         Post init method
         """
 
-        super().__post_init__()
+        Order.__post_init__(self)
 
         return self
 
@@ -184,10 +195,3 @@ class MarketOrder(Order):
             + f"MarketOrder(ticker={self.ticker}, direction={self.direction.name}, quantity={self.quantity}, submitted_at={make_human_readable(self.submitted_at)})"
             + "}"
         )
-
-    def __str__(self) -> str:
-        """
-        Representation of the order
-        """
-
-        return self.__repr__()
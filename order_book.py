@@ -2,56 +2,72 @@
 Order book
 """
 
-from dataclasses import dataclass
-from typing import Tuple, Optional
+from collections import deque
+import logging
+import sys
+from typing import Iterable, Optional, Union
 import time
-from copy import deepcopy
-import uuid
+
+from sortedcontainers import SortedDict
 
 from order import LimitOrder, MarketOrder, Order, OrderDirection
 from price_level import PriceLevel
-from util import Dollars, CustomPQ, InvalidOrderException
+from trade import Trade
+from util import (
+    Dollars,
+    InvalidOrderException,
+    OrderId,
+    Price,
+    UNCHANGED,
+    Unchanged,
+    format_price,
+    to_dollars,
+)
+
+logger = logging.getLogger(__name__)
+
+# Max number of trades, and of invalid orders per side, that are kept
+HISTORY_SIZE = 1 << 20
 
 
-@dataclass
 class OrderBook:
     """
     Order book
     """
 
-    ticker: str
-
-    def __post_init__(self):
+    __slots__ = (
+        "ticker",
+        "orders_by_id",
+        "bids",
+        "asks",
+        "trades",
+        "invalid_bids",
+        "invalid_asks",
+    )
+
+    def __init__(self, ticker: str):
         """
-        Post init method
+        Init method
         """
 
-        if not self.ticker:
+        if not ticker:
             raise ValueError("Ticker must be non-empty")
 
-        self.orders_by_id: dict[uuid.UUID, LimitOrder] = {}
+        self.ticker: str = sys.intern(ticker)
 
-        self.active_orders: dict[
-            OrderDirection, CustomPQ[Tuple[Dollars, PriceLevel]]
-        ] = {
-            OrderDirection.BID: CustomPQ(),
-            OrderDirection.ASK: CustomPQ(),
-        }
+        # Resting limit orders only
+        self.orders_by_id: dict[OrderId, LimitOrder] = {}
 
-        self.executed_orders: dict[OrderDirection, list[Order]] = {
-            OrderDirection.BID: [],
-            OrderDirection.ASK: [],
-        }
+        # Active price levels, keyed by priority (`direction * price`, see
+        # `LimitOrder.priority`), so the best price level comes first
+        self.bids: SortedDict[Price, PriceLevel] = SortedDict()
+        self.asks: SortedDict[Price, PriceLevel] = SortedDict()
 
-        self.invalid_orders: dict[OrderDirection, list[Order]] = {
-            OrderDirection.BID: [],
-            OrderDirection.ASK: [],
-        }
+        # Bounded, so only the most recent `HISTORY_SIZE` entries are kept
+        self.trades: deque[Trade] = deque(maxlen=HISTORY_SIZE)
 
-        self.price_levels: dict[OrderDirection, dict[Dollars, PriceLevel]] = {
-            OrderDirection.BID: {},
-            OrderDirection.ASK: {},
-        }
+        self.invalid_bids: deque[Order] = deque(maxlen=HISTORY_SIZE)
+        self.invalid_asks: deque[Order] = deque(maxlen=HISTORY_SIZE)
 
     def __repr__(self):
         """
@@ -60,83 +76,39 @@ class OrderBook:
 
         return (
             "{"
-            + f"OrderBook(ticker={self.ticker}, active_orders={self.active_orders}, executed_orders={self.executed_orders}, invalid_orders={self.invalid_orders}, price_levels={self.price_levels})"
+            + f"OrderBook(ticker={self.ticker}, bid_levels={len(self.bids)}, ask_levels={len(self.asks)}, resting_orders={len(self.orders_by_id)})"
             + "}"
         )
 
-    def __str__(self):
-        """
-        Representation of the order book
-        """
-
-        return self.__repr__()
-
     def get_active_orders_str(self) -> str:
         """
         Get active orders as string
         """
 
-        result = ""
-
-        result += f"Active orders for {self.ticker}: ===========\n\n"
+        parts: list[str] = [f"Active orders for {self.ticker}: ===========\n\n"]
 
-        for direction in OrderDirection:
-            result += f"{direction.name}:\n"
+        for direction, active_orders in (
+            (OrderDirection.ASK, self.asks),
+            (OrderDirection.BID, self.bids),
+        ):
+            parts.append(f"{direction.name}:\n")
 
-            pq = self.active_orders[direction]
-            copied_pq: CustomPQ[Tuple[Dollars, PriceLevel]] = CustomPQ()
-
-            if pq.empty():
-                result += "(No active orders)\n\n"
+            if not active_orders:
+                parts.append("(No active orders)\n\n")
                 continue
 
-            while not pq.empty():
-                priority, price_level = pq.get()
-                copied_pq.put((priority, price_level))
-
-                for order in price_level.orders.values():
+            for price_level in active_orders.values():
+                for order in price_level.orders:
                     if order.canceled_at:
                         continue
 
-                    result += f"Price: {price_level.price}, Order: {order}\n"
+                    parts.append(
+                        f"Price: {format_price(price_level.price)}, Order: {order}\n"
+                    )
 
-            pq = copied_pq
+            parts.append("\n")
 
-            result += "\n"
-
-        return result
-
-    def fill(self, a: Order, b: Order, price: Dollars):
-        """
-        Fill orders against each other
-        """
-
-        if not (a.ticker == self.ticker and b.ticker == self.ticker):
-            raise InvalidOrderException(a, "Tickers must match")
-
-        filled_a: Optional[Order] = None
-        filled_b: Optional[Order] = None
-
-        if a.quantity == b.quantity:
-            filled_a = a.fill_fully(price)
-            filled_b = b.fill_fully(price)
-
-        if a.quantity > b.quantity:
-            filled_a = a.fill_partially(b.quantity, price)
-            filled_b = b.fill_fully(price)
-
-        if a.quantity < b.quantity:
-            filled_a = a.fill_fully(price)
-            filled_b = b.fill_partially(a.quantity, price)
-
-        if not (filled_a and filled_b):
-            self.invalid_orders[a.direction].append(a)
-            self.invalid_orders[b.direction].append(b)
-
-            raise InvalidOrderException(a, "Failed to fill orders")
-
-        self.executed_orders[filled_a.direction].append(filled_a)
-        self.executed_orders[filled_b.direction].append(filled_b)
+        return "".join(parts)
 
     def execute_order(self, order: Order) -> Order:
         """
@@ -147,62 +119,74 @@ class OrderBook:
         if ticker != self.ticker:
             raise InvalidOrderException(order, "Tickers must match")
 
-        direction = order.direction
-        active_orders = self.active_orders[direction * -1]
-
-        # Store unmatched price levels to put back
-        unmatched = []
-
-        while not active_orders.empty():
-            if order.filled_at:
+        # Match against the opposite side
+        if order.direction == OrderDirection.BID:
+            active_orders = self.asks
+        else:
+            active_orders = self.bids
+
+        # All fills for this order happen at the same time
+        filled_at = time.time()
+        trades = self.trades
+        log_fills = logger.isEnabledFor(logging.DEBUG)
+
+        # Computing this bound once takes the order type and direction
+        # out of the loop below
+        max_priority = order.max_match_priority()
+
+        while active_orders and not order.filled_at:
+            # Peek at the best price level; it's only removed once exhausted
+            priority, matched_price_level = active_orders.peekitem(0)
+            if priority > max_priority:
                 break
 
-            priority, matched_price_level = active_orders.get()
             matched_price = matched_price_level.price
 
-            # Price check for limit orders
-            if isinstance(order, LimitOrder):
-                if (
-                    direction == OrderDirection.BID
-                    and matched_price > order.limit_price
-                ) or (
-                    direction == OrderDirection.ASK
-                    and matched_price < order.limit_price
-                ):
-                    unmatched.append((priority, matched_price_level))
-                    break
-
-            # Process orders at this price level
-            orders_to_remove = []
-            for matched_order in matched_price_level.orders.values():
-                if order.filled_at:
-                    break
-                if matched_order.canceled_at:
-                    orders_to_remove.append(matched_order.order_id)
-                    continue
-
-                while not matched_order.filled_at:
-                    if order.filled_at:
-                        break
-                    self.fill(matched_order, order, matched_price)
-
-                if matched_order.filled_at:
-                    orders_to_remove.append(matched_order.order_id)
-
-            # Remove filled orders
-            for order_id in orders_to_remove:
-                del matched_price_level.orders[order_id]
-                del self.orders_by_id[order_id]
-
-            # If price level still has orders, put it back
-            if matched_price_level.orders:
-                unmatched.append((priority, matched_price_level))
-            else:
-                del self.price_levels[direction * -1][matched_price]
-
-        # Put all unmatched price levels back
-        for priority, price_level in unmatched:
-            active_orders.put((priority, price_level))
+            # Fill orders at this price level, oldest first.
+            # No ticker check per fill: resting orders were checked on submission
+            orders = matched_price_level.orders
+            while orders and not order.filled_at:
+                matched_order = orders[0]
+                quantity = min(matched_order.quantity, order.quantity)
+
+                if log_fills:
+                    logger.debug(
+                        "\t--> Filled %s shares at $%s: %s against %s",
+                        quantity,
+                        format_price(matched_price),
+                        order,
+                        matched_order,
+                    )
+
+                trades.append(
+                    Trade(
+                        order.order_id,
+                        matched_order.order_id,
+                        quantity,
+                        matched_price,
+                        filled_at,
+                    )
+                )
+
+                order.quantity -= quantity
+                if not order.quantity:
+                    order.filled_at = filled_at
+                    order.filled_price = matched_price
+
+                matched_order.quantity -= quantity
+                if not matched_order.quantity:
+                    matched_order.filled_at = filled_at
+                    matched_order.filled_price = matched_price
+
+                    orders.popleft()
+                    del self.orders_by_id[matched_order.order_id]
+                    matched_price_level.active_count -= 1
+                    if orders and orders[0].canceled_at:
+                        matched_price_level.drop_canceled()
+
+            # If price level has no active orders left, remove it
+            if not matched_price_level.active_count:
+                active_orders.popitem(0)
 
         return order
 
@@ -211,21 +195,16 @@ class OrderBook:
         Submit and execute (fill, if possible) a market order
         """
 
-        self.orders_by_id[market_order.order_id] = market_order
-
-        direction = market_order.direction
-        invalid_orders = self.invalid_orders[direction]
-
         self.execute_order(market_order)
 
         if not market_order.filled_at:
-            invalid_orders.append(market_order)
-
-            if direction == OrderDirection.BID:
+            if market_order.direction == OrderDirection.BID:
+                self.invalid_bids.append(market_order)
                 raise InvalidOrderException(
                     market_order, "Failed to fill market order: no more asks available"
                 )
 
+            self.invalid_asks.append(market_order)
             raise InvalidOrderException(
                 market_order,
                 "Failed to fill market order: no more bids available",
@@ -238,32 +217,58 @@ class OrderBook:
         Submit a limit order
         """
 
-        self.orders_by_id[limit_order.order_id] = limit_order
-
-        direction = limit_order.direction
-        limit_price = limit_order.limit_price
-
-        price_levels = self.price_levels[direction]
-        active_orders = self.active_orders[direction]
+        if limit_order.direction == OrderDirection.BID:
+            active_orders = self.bids
+        else:
+            active_orders = self.asks
 
         self.execute_order(limit_order)
 
         if not limit_order.filled_at:
-            price_level: Optional[PriceLevel] = None
-
-            if limit_price in price_levels:
-                price_level = price_levels[limit_price]
-            else:
-                price_level = PriceLevel(limit_price)
-                price_levels[limit_price] = price_level
+            priority = limit_order.priority
 
-                active_orders.put((direction * limit_price, price_level))
+            # `SortedDict` is a dict, so this lookup is O(1)
+            price_level: Optional[PriceLevel] = active_orders.get(priority)
+            if price_level is None:
+                price_level = PriceLevel(limit_order.limit_price)
+                active_orders[priority] = price_level
 
-            price_level.orders[limit_order.order_id] = limit_order
+            price_level.orders.append(limit_order)
+            price_level.active_count += 1
+            self.orders_by_id[limit_order.order_id] = limit_order
 
         return limit_order
 
-    def cancel_limit_order(self, order_id: uuid.UUID) -> LimitOrder:
+    def submit_batch(self, orders: Iterable[Order]):
+        """
+        Submit a batch of orders for this ticker, in the given order
+
+        Market orders that can't be filled are recorded in `invalid_bids` or
+        `invalid_asks`, like with `submit_market_order`, but don't stop the
+        rest of the batch
+        """
+
+        ticker = self.ticker
+        submit_limit_order = self.submit_limit_order
+        execute_order = self.execute_order
+
+        for order in orders:
+            if isinstance(order, LimitOrder):
+                submit_limit_order(order)
+                continue
+
+            if order.ticker != ticker:
+                raise InvalidOrderException(order, "Tickers must match")
+
+            execute_order(order)
+
+            if not order.filled_at:
+                if order.direction == OrderDirection.BID:
+                    self.invalid_bids.append(order)
+                else:
+                    self.invalid_asks.append(order)
+
+    def cancel_limit_order(self, order_id: OrderId) -> LimitOrder:
         """
         Cancel a limit order
         """
@@ -277,32 +282,61 @@ class OrderBook:
         del self.orders_by_id[order_id]
         order.canceled_at = time.time()
 
-        price_level = self.price_levels[order.direction][order.limit_price]
-        del price_level.orders[order_id]
+        if order.direction == OrderDirection.BID:
+            active_orders = self.bids
+        else:
+            active_orders = self.asks
+
+        # The order stays in its price level's queue until it reaches the front,
+        # or until there are more canceled orders than active ones left in it
+        priority = order.priority
+        price_level = active_orders[priority]
+        price_level.active_count -= 1
 
-        if not price_level.orders:
-            del self.price_levels[order.direction][order.limit_price]
+        if not price_level.active_count:
+            del active_orders[priority]
+        elif len(price_level.orders) > 2 * price_level.active_count:
+            price_level.compact()
+        else:
+            price_level.drop_canceled()
 
         return order
 
     def update_limit_order(
         self,
-        order_id: uuid.UUID,
-        new_quantity: Optional[int],
-        new_price: Optional[float],
+        order_id: OrderId,
+        new_quantity: Union[int, Unchanged] = UNCHANGED,
+        new_price: Union[Dollars, Unchanged] = UNCHANGED,
     ) -> LimitOrder:
         """
         Update a limit order
         Basically equivalent to canceling and resubmitting
+
+        Leave `new_quantity` or `new_price` as `UNCHANGED` to keep the current value
         """
 
-        order = self.cancel_limit_order(order_id)
+        if order_id not in self.orders_by_id:
+            raise InvalidOrderException(
+                None, f"Could not find an order with order ID {order_id}"
+            )
+
+        order = self.orders_by_id[order_id]
+
+        # Any other value, including `None`, is validated by `LimitOrder` below
+        if new_quantity is UNCHANGED:
+            new_quantity = order.quantity
+        if new_price is UNCHANGED:
+            new_price = to_dollars(order.limit_price)
+
+        # Build (and validate) the new order before canceling the old one.
+        # It gets its own order ID and submission time
+        new_order = LimitOrder(
+            ticker=order.ticker,
+            direction=order.direction,
+            quantity=new_quantity,
+            limit_price_dollars=new_price,
+        )
 
-        new_order = deepcopy(order)
-        new_order.quantity = new_quantity if new_quantity else order.quantity
-        new_order.limit_price = new_price if new_price else order.limit_price
-        new_order.canceled_at = None
-        new_order.submitted_at = time.time()
-        new_order.order_id = uuid.uuid4()
+        self.cancel_limit_order(order_id)
 
         return self.submit_limit_order(new_order)
@@ -2,38 +2,56 @@
 Price level
 """
 
-import uuid
-from dataclasses import dataclass
+from collections import deque
 
-from util import Dollars
+from util import Price, format_price
 from order import LimitOrder
 
 
-@dataclass
 class PriceLevel:
     """
     A price level in the order book
     """
 
-    price: Dollars
+    __slots__ = ("price", "orders", "active_count")
 
-    def __post_init__(self):
+    def __init__(self, price: Price):
         """
-        Post init method
+        Init method
         """
 
-        self.orders: dict[uuid.UUID, LimitOrder] = {}
+        self.price: Price = price
 
-    def __repr__(self):
+        # FIFO queue, in time priority
+        self.orders: deque[LimitOrder] = deque()
+
+        # Number of orders in `orders` that aren't canceled
+        self.active_count: int = 0
+
+    def drop_canceled(self):
         """
-        Representation of the price level
+        Pop canceled orders off the front of the queue,
+        so that the first order (if any) is always active
         """
 
-        return "{" + f"PriceLevel(price=${self.price}, orders={self.orders})" + "}"
+        orders = self.orders
+        while orders and orders[0].canceled_at:
+            orders.popleft()
 
-    def __str__(self):
+    def compact(self):
+        """
+        Remove all canceled orders from the queue, keeping time priority
+        """
+
+        self.orders = deque(order for order in self.orders if not order.canceled_at)
+
+    def __repr__(self):
         """
         Representation of the price level
         """
 
-        return self.__repr__()
+        return (
+            "{"
+            + f"PriceLevel(price=${format_price(self.price)}, orders={self.active_count})"
+            + "}"
+        )
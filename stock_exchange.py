@@ -2,50 +2,83 @@
 Stock exchange
 """
 
-from dataclasses import dataclass
-from typing import Optional
-import uuid
+from collections import defaultdict
+from typing import Iterable, Union
 
-from order import LimitOrder, MarketOrder
+from order import LimitOrder, MarketOrder, Order
 from order_book import OrderBook
+from util import UNCHANGED, Dollars, OrderId, Unchanged
 
 
-@dataclass
-class StockExchange:
+class _OrderBooks(dict):
     """
-    Stock market exchange
+    Order books by ticker, creating an order book the first time a ticker is seen
+
+    Looking up an existing order book is then a single dict lookup
     """
 
-    def __post_init__(self):
+    def create(self, ticker: str) -> OrderBook:
         """
-        Post init method
+        Create the order book for a new ticker
         """
 
-        self.order_books: dict[str, OrderBook] = {}
+        # Keyed by the order book's interned ticker, so lookups with orders'
+        # (also interned) tickers compare by identity
+        order_book = OrderBook(ticker)
+        self[order_book.ticker] = order_book
 
-    def __repr__(self):
+        return order_book
+
+    def __missing__(self, ticker: str) -> OrderBook:
         """
-        Representation of the exchange
+        Create the order book the first time a ticker is looked up
         """
 
-        return "{" + f"Exchange(order_books={self.order_books})" + "}"
+        return self.create(ticker)
+
+
+class StockExchange:
+    """
+    Stock market exchange
+    """
+
+    __slots__ = ("order_books",)
 
-    def __str__(self):
+    def __init__(self, initial_tickers: Iterable[str] = ()):
         """
-        Representation of the exchange
+        Init method
+
+        Order books for `initial_tickers` (known tickers) are created upfront
         """
 
-        return self.__repr__()
+        self.order_books: dict[str, OrderBook] = _OrderBooks()
+
+        create_order_book = self.order_books.create
+        for ticker in initial_tickers:
+            create_order_book(ticker)
 
-    def get_or_create_order_book(self, ticker: str) -> OrderBook:
+    def __repr__(self):
+        """
+        Representation of the exchange
         """
-        Ensure an order book exists for a ticker
+
+        return (
+            "{"
+            + f"Exchange(tickers={list(self.order_books)}, n={len(self.order_books)})"
+            + "}"
+        )
+
+    def debug_repr(self) -> str:
         """
+        Full representation of the exchange, including every active order
 
-        if ticker not in self.order_books:
-            self.order_books[ticker] = OrderBook(ticker)
+        O(total orders), so only meant to be called explicitly
+        """
 
-        return self.order_books[ticker]
+        return "".join(
+            order_book.get_active_orders_str()
+            for order_book in self.order_books.values()
+        )
 
     def submit_market_order(self, market_order: MarketOrder) -> MarketOrder:
         """
@@ -54,7 +87,7 @@ class StockExchange:
 
         ticker = market_order.ticker
 
-        return self.get_or_create_order_book(ticker).submit_market_order(market_order)
+        return self.order_books[ticker].submit_market_order(market_order)
 
     def submit_limit_order(self, limit_order: LimitOrder) -> LimitOrder:
         """
@@ -63,27 +96,54 @@ class StockExchange:
 
         ticker = limit_order.ticker
 
-        return self.get_or_create_order_book(ticker).submit_limit_order(limit_order)
+        return self.order_books[ticker].submit_limit_order(limit_order)
+
+    def submit_many(self, orders: Iterable[Order]):
+        """
+        Submit a feed of (limit and/or market) orders
+
+        Orders are grouped by ticker, so each order book is looked up once
+        and handed its orders as one batch, in their original order
+        """
+
+        orders_by_ticker: defaultdict[str, list[Order]] = defaultdict(list)
+        for order in orders:
+            orders_by_ticker[order.ticker].append(order)
+
+        order_books = self.order_books
+        for ticker, ticker_orders in orders_by_ticker.items():
+            order_books[ticker].submit_batch(ticker_orders)
+
+    def submit_limit_orders(self, limit_orders: Iterable[LimitOrder]):
+        """
+        Submit a feed of limit orders
 
-    def cancel_limit_order(self, ticker: str, order_id: uuid.UUID) -> LimitOrder:
+        Same as `submit_many`, for a feed that only has limit orders
+        """
+
+        self.submit_many(limit_orders)
+
+    def cancel_limit_order(self, ticker: str, order_id: OrderId) -> LimitOrder:
         """
         Cancel a limit order
         """
 
-        return self.get_or_create_order_book(ticker).cancel_limit_order(order_id)
+        return self.order_books[ticker].cancel_limit_order(order_id)
 
     def update_limit_order(
         self,
         ticker: str,
-        order_id: uuid.UUID,
-        new_quantity: Optional[int],
-        new_price: Optional[float],
+        order_id: OrderId,
+        new_quantity: Union[int, Unchanged] = UNCHANGED,
+        new_price: Union[Dollars, Unchanged] = UNCHANGED,
     ) -> LimitOrder:
         """
         Update a limit order
+
+        Leave `new_quantity` or `new_price` as `UNCHANGED` to keep the current value
         """
 
-        return self.get_or_create_order_book(ticker).update_limit_order(
+        return self.order_books[ticker].update_limit_order(
             order_id, new_quantity, new_price
         )
 
@@ -92,4 +152,4 @@ class StockExchange:
         Get a string representation of the active orders for a ticker
         """
 
-        return self.get_or_create_order_book(ticker).get_active_orders_str()
+        return self.order_books[ticker].get_active_orders_str()
@@ -14,13 +14,19 @@ def test_0():
     exchange = StockExchange()
 
     limit_order0 = LimitOrder(
-        ticker="AAPL", direction=OrderDirection.BID, quantity=100, limit_price=100
+        ticker="AAPL",
+        direction=OrderDirection.BID,
+        quantity=100,
+        limit_price_dollars=100,
     )
     print(f"\nSubmitting limit order: {limit_order0}")
     exchange.submit_limit_order(limit_order0)
 
     limit_order_1 = LimitOrder(
-        ticker="AAPL", direction=OrderDirection.BID, quantity=200, limit_price=110
+        ticker="AAPL",
+        direction=OrderDirection.BID,
+        quantity=200,
+        limit_price_dollars=110,
     )
     print(f"\nSubmitting limit order: {limit_order_1}")
     exchange.submit_limit_order(limit_order_1)
@@ -32,19 +38,28 @@ def test_0():
     exchange.submit_market_order(market_order_0)
 
     limit_order_2 = LimitOrder(
-        ticker="AAPL", direction=OrderDirection.ASK, quantity=100, limit_price=140
+        ticker="AAPL",
+        direction=OrderDirection.ASK,
+        quantity=100,
+        limit_price_dollars=140,
     )
     print(f"\nSubmitting limit order: {limit_order_2}")
     exchange.submit_limit_order(limit_order_2)
 
     limit_order_3 = LimitOrder(
-        ticker="AAPL", direction=OrderDirection.BID, quantity=40, limit_price=160
+        ticker="AAPL",
+        direction=OrderDirection.BID,
+        quantity=40,
+        limit_price_dollars=160,
     )
     print(f"\nSubmitting limit order: {limit_order_3}")
     exchange.submit_limit_order(limit_order_3)
 
     limit_order_4 = LimitOrder(
-        ticker="GOOG", direction=OrderDirection.BID, quantity=30, limit_price=150
+        ticker="GOOG",
+        direction=OrderDirection.BID,
+        quantity=30,
+        limit_price_dollars=150,
     )
     print(f"\nSubmitting limit order: {limit_order_4}")
     exchange.submit_limit_order(limit_order_4)
@@ -53,3 +68,125 @@ def test_0():
 
     for order_book in exchange.order_books.values():
         print(order_book.get_active_orders_str())
+
+
+def test_1():
+    """
+    Test #1: submit a feed of orders at once
+    """
+
+    exchange = StockExchange()
+
+    orders = [
+        LimitOrder(
+            ticker="AAPL",
+            direction=OrderDirection.ASK,
+            quantity=100,
+            limit_price_dollars=120,
+        ),
+        LimitOrder(
+            ticker="MSFT",
+            direction=OrderDirection.BID,
+            quantity=10,
+            limit_price_dollars=300,
+        ),
+        LimitOrder(
+            ticker="AAPL",
+            direction=OrderDirection.ASK,
+            quantity=50,
+            limit_price_dollars=125,
+        ),
+        MarketOrder(ticker="AAPL", direction=OrderDirection.BID, quantity=120),
+        # Can't be filled, since there are no asks for MSFT
+        MarketOrder(ticker="MSFT", direction=OrderDirection.BID, quantity=10),
+        LimitOrder(
+            ticker="MSFT",
+            direction=OrderDirection.ASK,
+            quantity=5,
+            limit_price_dollars=290,
+        ),
+    ]
+    print(f"\nSubmitting {len(orders)} orders at once")
+    exchange.submit_many(orders)
+
+    print("\n")
+
+    for order_book in exchange.order_books.values():
+        print(order_book.get_active_orders_str())
+
+
+def test_2():
+    """
+    Test #2: cancel and update limit orders
+    """
+
+    exchange = StockExchange()
+
+    # Six asks at the same price level, and one at the next level
+    asks = [
+        LimitOrder(
+            ticker="AAPL",
+            direction=OrderDirection.ASK,
+            quantity=10,
+            limit_price_dollars=100,
+        )
+        for _ in range(6)
+    ]
+    asks.append(
+        LimitOrder(
+            ticker="AAPL",
+            direction=OrderDirection.ASK,
+            quantity=10,
+            limit_price_dollars=101,
+        )
+    )
+    print(f"\nSubmitting {len(asks)} limit orders")
+    exchange.submit_limit_orders(asks)
+
+    # Front, middle, back, then middle again, which leaves more canceled
+    # orders than active ones in the price level
+    for i in (0, 2, 5, 3):
+        print(f"\nCanceling limit order: {asks[i]}")
+        exchange.cancel_limit_order("AAPL", asks[i].order_id)
+
+    print("\n")
+    print(exchange.get_active_orders_str("AAPL"))
+
+    # Takes both remaining orders at $100, then 5 shares at $101
+    market_order = MarketOrder(ticker="AAPL", direction=OrderDirection.BID, quantity=25)
+    print(f"\nSubmitting market order: {market_order}")
+    exchange.submit_market_order(market_order)
+
+    limit_order = LimitOrder(
+        ticker="AAPL", direction=OrderDirection.BID, quantity=10, limit_price_dollars=99
+    )
+    print(f"\nSubmitting limit order: {limit_order}")
+    exchange.submit_limit_order(limit_order)
+
+    # Now crosses the rest of the $101 ask
+    print(f"\nUpdating limit order: {limit_order}")
+    exchange.update_limit_order("AAPL", limit_order.order_id, new_price=101)
+
+    # The resting order is only partially filled
+    limit_order_0 = LimitOrder(
+        ticker="MSFT",
+        direction=OrderDirection.ASK,
+        quantity=60,
+        limit_price_dollars=110,
+    )
+    print(f"\nSubmitting limit order: {limit_order_0}")
+    exchange.submit_limit_order(limit_order_0)
+
+    limit_order_1 = LimitOrder(
+        ticker="MSFT",
+        direction=OrderDirection.BID,
+        quantity=50,
+        limit_price_dollars=110,
+    )
+    print(f"\nSubmitting limit order: {limit_order_1}")
+    exchange.submit_limit_order(limit_order_1)
+
+    print("\n")
+
+    for order_book in exchange.order_books.values():
+        print(order_book.get_active_orders_str())
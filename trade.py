@@ -0,0 +1,31 @@
+"""
+Trade
+"""
+
+from dataclasses import dataclass
+
+from util import OrderId, Price, Timestamp, format_price, make_human_readable
+
+
+@dataclass(slots=True)
+class Trade:
+    """
+    One fill of an incoming (aggressor) order against a resting limit order
+    """
+
+    aggressor_id: OrderId
+    resting_id: OrderId
+    quantity: int
+    price: Price
+    filled_at: Timestamp
+
+    def __repr__(self) -> str:
+        """
+        Representation of the trade
+        """
+
+        return (
+            "{"
+            + f"Trade(aggressor_id={self.aggressor_id}, resting_id={self.resting_id}, quantity={self.quantity}, price=${format_price(self.price)}, filled_at={make_human_readable(self.filled_at)})"
+            + "}"
+        )
@@ -2,28 +2,29 @@
 Utilities
 """
 
-from queue import PriorityQueue
 from typing import Any
-from datetime import datetime
+from decimal import Decimal, Inexact, InvalidOperation, localcontext
+from enum import Enum, auto
+import math
 
 Dollars = float
+OrderId = int
+Price = int  # Whole number of ticks
 Timestamp = float
 
+TICK_SIZE = Decimal("0.01")
 
-class CustomPQ(PriorityQueue):
+
+class Unchanged(Enum):
     """
-    Wrapper around PriorityQueue, to allow for custom __repr__ and __str__ methods
+    Type of the `UNCHANGED` sentinel
     """
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+    UNCHANGED = auto()
 
-    def __repr__(self):
-        queue_values = [elt[1].__repr__() for elt in self.queue]
-        return "{" + f"CustomPQ({', '.join(queue_values)})" + "}"
 
-    def __str__(self):
-        return self.__repr__()
+# Default for optional arguments, meaning "keep the current value"
+UNCHANGED = Unchanged.UNCHANGED
 
 
 class InvalidOrderException(Exception):
@@ -42,4 +43,56 @@ def make_human_readable(timestamp: Timestamp):
     Convert timestamp to human readable format
     """
 
-    return datetime.fromtimestamp(timestamp).strftime("%f")[2:]
+    # Last 4 digits of the microseconds, same as
+    # `datetime.fromtimestamp(timestamp).strftime("%f")[2:]`,
+    # without building a `datetime`
+    microseconds = round(math.modf(timestamp)[0] * 1_000_000)
+
+    return f"{microseconds % 10_000:04d}"
+
+
+def to_price(dollars: Dollars) -> Price:
+    """
+    Convert dollars (an `int`, `float` or `Decimal`) to a whole number of ticks
+
+    Raises `ValueError` if `dollars` isn't a number, isn't finite, or isn't
+    exactly a whole number of ticks (prices are never rounded)
+    """
+
+    if isinstance(dollars, bool) or not isinstance(dollars, (int, float, Decimal)):
+        raise ValueError("Price must be a number")
+
+    # Go through `str` so that e.g. 0.29 doesn't become 0.28999...
+    # Trapping `Inexact` makes the division fail instead of rounding when
+    # there are more digits than the context's precision
+    with localcontext() as context:
+        context.traps[Inexact] = True
+        try:
+            ticks = Decimal(str(dollars)) / TICK_SIZE
+        except Inexact as e:
+            raise ValueError("Price has too many digits") from e
+        except InvalidOperation as e:
+            raise ValueError("Price must be a number") from e
+
+    if not ticks.is_finite():
+        raise ValueError("Price must be finite")
+    if ticks != ticks.to_integral_value():
+        raise ValueError(f"Price must be a whole number of ticks (${TICK_SIZE})")
+
+    return int(ticks)
+
+
+def to_dollars(price: Price) -> Decimal:
+    """
+    Convert ticks back to (exact) dollars
+    """
+
+    return price * TICK_SIZE
+
+
+def format_price(price: Price) -> str:
+    """
+    Convert ticks to dollars, for display
+    """
+
+    return str(to_dollars(price))